@@ -1,23 +1,32 @@
+import asyncio
 import psycopg2
-import psycopg2.extras
+import psycopg2.pool
+from psycopg2 import sql
 from typing import Dict, Any, List, Optional
 import logging
 import os
+import threading
 import json
 from datetime import datetime, date
 from decimal import Decimal
-from contextlib import contextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# --- Self-Contained Dummy RedisClient ---
-# This class replaces the need for the original utils/redis_client.py file.
-# It allows the script to run without a Redis server by simulating a disconnected state.
+# --- Self-Contained RedisClient ---
+# These classes replace the need for the original utils/redis_client.py file.
+# Without a reachable Redis server the script runs with a dummy client that simulates a disconnected state.
 class StandaloneRedisClient:
     """A dummy Redis client that always reports as disconnected."""
     def __init__(self):
@@ -46,28 +55,241 @@ class StandaloneRedisClient:
             key += ":with_samples"
         return key
 
+# Keep an unreachable or slow Redis from holding up schema fetches for long
+REDIS_TIMEOUT_SECONDS = 2
+
+class RedisClient(StandaloneRedisClient):
+    """Redis-backed schema cache, used when REDIS_URL is set and the redis library is installed."""
+    def __init__(self, redis_conn):
+        logger.info("Connected to Redis. Caching is enabled.")
+        self.redis = redis_conn
+        self.connected = True
+
+    def get_cached_schema(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = self.redis.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Could not read cached schema: {e}")
+            return None
+        return loads_schema(raw) if raw else None
+
+    def cache_schema(self, cache_key: str, schema_data: Dict[str, Any], ttl_seconds: int = 3600) -> bool:
+        try:
+            return bool(self.redis.set(cache_key, dumps_schema(schema_data), ex=ttl_seconds))
+        except Exception as e:
+            logger.warning(f"Could not cache schema: {e}")
+            return False
+
 def get_redis_client() -> StandaloneRedisClient:
-    """Returns an instance of our dummy Redis client."""
+    """Returns a Redis-backed client if REDIS_URL is reachable, otherwise our dummy client."""
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+            redis_conn = redis.Redis.from_url(
+                redis_url, socket_connect_timeout=REDIS_TIMEOUT_SECONDS, socket_timeout=REDIS_TIMEOUT_SECONDS
+            )
+            redis_conn.ping()
+            return RedisClient(redis_conn)
+        except ImportError:
+            logger.info("The 'redis' library is not installed.")
+        except Exception as e:
+            logger.warning(f"Could not connect to Redis: {e}")
     return StandaloneRedisClient()
-# --- End of Self-Contained Dummy RedisClient ---
-
-
-def make_json_serializable(data):
-    """Recursively convert data to be JSON serializable."""
-    if isinstance(data, dict):
-        return {key: make_json_serializable(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        return [make_json_serializable(item) for item in data]
-    elif isinstance(data, (datetime, date)):
-        return data.isoformat()
-    elif isinstance(data, Decimal):
-        return float(data)
-    elif data is None:
-        return None
-    elif isinstance(data, (str, int, float, bool)):
-        return data
-    else:
-        return str(data)
+# --- End of Self-Contained RedisClient ---
+
+
+def json_default(obj):
+    """json.dumps default hook for the few values that are not natively JSON serializable."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+def dumps_schema(schema_data: Dict[str, Any]) -> bytes:
+    """Serialize a schema context for caching, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.dumps(schema_data, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(schema_data, default=json_default).encode("utf-8")
+
+def loads_schema(raw: bytes) -> Dict[str, Any]:
+    """Deserialize a cached schema context."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Column types whose values are analyzed for categorical data
+TEXT_DATA_TYPES = ("text", "varchar", "character varying")
+
+# Maximum number of distinct values for a column to count as categorical
+CATEGORICAL_THRESHOLD = 10
+
+def estimated_distinct_count(stats: Dict[str, Any]) -> float:
+    """Absolute distinct count from column stats, or 0 if it cannot be estimated.
+
+    A negative n_distinct is a fraction of the row count, scaled here by the table's
+    reltuples estimate (-1 or 0 when the table has never been vacuumed or analyzed).
+    """
+    n_distinct = stats["n_distinct"] or 0
+    if n_distinct >= 0:
+        return n_distinct
+    reltuples = stats.get("reltuples") or 0
+    return -n_distinct * reltuples if reltuples > 0 else 0
+
+def has_usable_column_stats(stats: Optional[Dict[str, Any]]) -> bool:
+    """Whether stats are exact enough to decide if a column is categorical.
+
+    Clearly high-cardinality columns are decided from the estimate alone. At or below
+    the threshold the estimate may be off (small tables) and most_common_vals leaves
+    out values seen only once, so the value list must cover every distinct value.
+    """
+    if not stats:
+        return False
+    distinct = estimated_distinct_count(stats)
+    if distinct > CATEGORICAL_THRESHOLD:
+        return True
+    return stats["n_distinct"] > 0 and len(stats["most_common_vals"] or []) >= stats["n_distinct"]
+
+# (substring, semantic type) pairs checked in order against lowercased column names
+SEMANTIC_TYPE_TOKENS = (
+    ("email", "email"),
+    ("phone", "phone"),
+    ("password", "password"),
+    ("status", "status"),
+    ("role", "role"),
+    ("_at", "timestamp"),
+    ("id", "identifier"),
+    ("name", "name"),
+)
+
+# (required column names, purpose) pairs; the first signature fully present in a table wins
+TABLE_PURPOSE_SIGNATURES = (
+    (frozenset({"email", "password"}), "User authentication and profile data"),
+)
+
+# Columns, primary keys, foreign keys and column stats in a single round-trip, one row per
+# table with everything aggregated into a jsonb document. Pass the table-name list (or None
+# for all tables) twice. Defined once at import instead of being rebuilt on every call.
+SCHEMA_METADATA_QUERY = f"""
+WITH tbls AS (
+    SELECT t.table_name
+    FROM information_schema.tables t
+    WHERE t.table_schema = 'public' AND t.table_type = 'BASE TABLE'
+      AND (%s::text[] IS NULL OR t.table_name = ANY(%s::text[]))
+),
+cols AS (
+    SELECT c.table_name,
+           jsonb_agg(jsonb_build_object(
+               'column_name', c.column_name,
+               'data_type', c.data_type,
+               'is_nullable', c.is_nullable = 'YES',
+               'is_selectable', has_column_privilege(
+                   quote_ident(c.table_schema) || '.' || quote_ident(c.table_name), c.column_name, 'SELECT'
+               )
+           ) ORDER BY c.ordinal_position) AS columns
+    FROM information_schema.columns c
+    JOIN tbls ON tbls.table_name = c.table_name
+    WHERE c.table_schema = 'public'
+    GROUP BY c.table_name
+),
+pks AS (
+    SELECT tc.table_name, jsonb_agg(kcu.column_name ORDER BY kcu.ordinal_position) AS primary_keys
+    FROM information_schema.table_constraints tc
+    JOIN information_schema.key_column_usage kcu
+      ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema
+    JOIN tbls ON tbls.table_name = tc.table_name
+    WHERE tc.table_schema = 'public' AND tc.constraint_type = 'PRIMARY KEY'
+    GROUP BY tc.table_name
+),
+fks AS (
+    -- Read from pg_constraint: FK names need not be unique within a schema, and FKs may
+    -- reference a unique index rather than a declared constraint. conkey/confkey are
+    -- unnested together so composite keys pair up column by column.
+    SELECT cl.relname AS table_name,
+           jsonb_agg(jsonb_build_object(
+               'column', a.attname,
+               'references_table', rcl.relname,
+               'references_column', ra.attname
+           ) ORDER BY con.conname, k.ord) AS foreign_keys
+    FROM pg_constraint con
+    JOIN pg_class cl ON cl.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = cl.relnamespace
+    JOIN pg_class rcl ON rcl.oid = con.confrelid
+    CROSS JOIN LATERAL unnest(con.conkey, con.confkey) WITH ORDINALITY AS k(attnum, ref_attnum, ord)
+    JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+    JOIN pg_attribute ra ON ra.attrelid = con.confrelid AND ra.attnum = k.ref_attnum
+    JOIN tbls ON tbls.table_name = cl.relname
+    WHERE n.nspname = 'public' AND con.contype = 'f'
+    GROUP BY cl.relname
+),
+stats AS (
+    SELECT s.tablename AS table_name,
+           jsonb_object_agg(s.attname, jsonb_build_object(
+               'n_distinct', s.n_distinct,
+               'reltuples', pc.reltuples,
+               'most_common_vals', to_jsonb(s.most_common_vals::text::text[])
+           )) AS column_stats
+    FROM pg_stats s
+    JOIN tbls ON tbls.table_name = s.tablename
+    -- Row estimate to turn a negative (fractional) n_distinct into an absolute count
+    JOIN pg_namespace pn ON pn.nspname = s.schemaname
+    JOIN pg_class pc ON pc.relnamespace = pn.oid AND pc.relname = s.tablename
+    -- Only text columns are analyzed, so skip the value lists of everything else
+    JOIN information_schema.columns c
+      ON c.table_schema = s.schemaname AND c.table_name = s.tablename AND c.column_name = s.attname
+    WHERE s.schemaname = 'public' AND c.data_type IN ({', '.join(repr(t) for t in TEXT_DATA_TYPES)})
+    GROUP BY s.tablename
+)
+SELECT tbls.table_name, jsonb_build_object(
+    'columns', COALESCE(cols.columns, '[]'::jsonb),
+    'primary_keys', COALESCE(pks.primary_keys, '[]'::jsonb),
+    'foreign_keys', COALESCE(fks.foreign_keys, '[]'::jsonb),
+    'column_stats', COALESCE(stats.column_stats, '{{}}'::jsonb)
+) AS meta
+FROM tbls
+LEFT JOIN cols ON cols.table_name = tbls.table_name
+LEFT JOIN pks ON pks.table_name = tbls.table_name
+LEFT JOIN fks ON fks.table_name = tbls.table_name
+LEFT JOIN stats ON stats.table_name = tbls.table_name
+ORDER BY tbls.table_name
+"""
+
+# Query an entity mapping resolves to, filled from its "table" and "filter_condition"
+ENTITY_QUERY_TEMPLATE = 'SELECT * FROM "{table}" WHERE {filter_condition}'
+
+# Upper bound on pooled connections, and so on concurrent schema fetches hitting the database
+POOL_MAX_CONNECTIONS = 10
+
+class _PooledConnection:
+    """Context manager that borrows a connection from a pool and hands it back on exit"""
+    __slots__ = ("pool", "slots", "conn")
+
+    def __init__(self, pool: psycopg2.pool.AbstractConnectionPool, slots: threading.BoundedSemaphore):
+        self.pool = pool
+        self.slots = slots
+        self.conn = None
+
+    def __enter__(self):
+        # getconn() raises PoolError instead of waiting once the pool is exhausted,
+        # so block here until a connection is free
+        self.slots.acquire()
+        try:
+            self.conn = self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            logger.error(f"Database connection error: {exc_value}")
+        try:
+            # Connections that raised are closed instead of going back into the pool
+            self.pool.putconn(self.conn, close=exc_type is not None)
+        finally:
+            self.slots.release()
+        return False
 
 class DatabaseOperations:
     """Database operations handler for PostgreSQL"""
@@ -80,185 +302,232 @@ class DatabaseOperations:
         else:
             logger.info("DATABASE_URL loaded from environment")
         
-        # Initialize Redis client for caching
-        self.redis_client = get_redis_client()
+        # Redis client for caching, created on first use
+        self._redis_client = None
+
+        # Connections are reused across calls instead of reconnecting every time
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._pool_slots = threading.BoundedSemaphore(POOL_MAX_CONNECTIONS)
         
         logger.info("DatabaseOperations initialized")
+
+    @property
+    def redis_client(self) -> StandaloneRedisClient:
+        if self._redis_client is None:
+            self._redis_client = get_redis_client()
+        return self._redis_client
     
-    @contextmanager
-    def get_connection(self):
-        """Get a database connection with proper cleanup"""
-        conn = None
-        try:
-            conn = psycopg2.connect(self.connection_string)
-            yield conn
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            logger.error(f"Database connection error: {e}")
-            raise
-        finally:
-            if conn:
-                conn.close()
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        """Create the connection pool on first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(minconn=1, maxconn=POOL_MAX_CONNECTIONS, dsn=self.connection_string)
+        return self._pool
+
+    def get_connection(self) -> "_PooledConnection":
+        """Get a pooled database connection, discarding it if it errored"""
+        return _PooledConnection(self._get_pool(), self._pool_slots)
+
+    def close(self):
+        """Close all pooled connections"""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
     
     async def fetch_schema_context(self, table_names: Optional[List[str]] = None, include_samples: bool = False) -> Dict[str, Any]:
         """Fetches enhanced database schema context."""
         try:
-            cache_key = self.redis_client.generate_schema_cache_key(table_names, include_samples)
-            if self.redis_client.is_connected():
-                cached_schema = self.redis_client.get_cached_schema(cache_key)
+            # Creating the client pings Redis and get/set are blocking, so they run on worker threads too
+            redis_client = self._redis_client or await asyncio.to_thread(lambda: self.redis_client)
+            cache_key = redis_client.generate_schema_cache_key(table_names, include_samples)
+            if redis_client.is_connected():
+                cached_schema = await asyncio.to_thread(redis_client.get_cached_schema, cache_key)
                 if cached_schema:
                     return {"status": "success", "schema_context": cached_schema, "cached": True}
 
             logger.info(f"Fetching schema from database for tables: {table_names or 'all'}")
             
-            with self.get_connection() as conn:
-                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-                    schema_context = {
-                        "tables": {}, "relationships": [], "entity_mappings": {},
-                        "semantic_context": {}, "column_value_analysis": {},
-                        "natural_language_guide": {}, "metadata": {
-                            "cached": False, "cache_key": cache_key
-                        }
-                    }
-                    
-                    table_filter = ""
-                    params = []
-                    if table_names:
-                        placeholders = ",".join(["%s"] * len(table_names))
-                        table_filter = f"AND t.table_name IN ({placeholders})"
-                        params = table_names
-                    
-                    # Query for table and column info
-                    table_query = f"""
-                    SELECT t.table_name, c.column_name, c.data_type, c.is_nullable
-                    FROM information_schema.tables t
-                    JOIN information_schema.columns c ON t.table_name = c.table_name
-                    WHERE t.table_schema = 'public' AND t.table_type = 'BASE TABLE' {table_filter}
-                    ORDER BY t.table_name, c.ordinal_position
-                    """
-                    cursor.execute(table_query, params)
-                    for row in cursor.fetchall():
-                        if row['table_name'] not in schema_context["tables"]:
-                            schema_context["tables"][row['table_name']] = {"columns": {}, "primary_keys": [], "foreign_keys": []}
-                        schema_context["tables"][row['table_name']]["columns"][row['column_name']] = {
-                            "data_type": row['data_type'],
-                            "is_nullable": row['is_nullable'] == 'YES'
-                        }
-                    
-                    # Query for primary keys
-                    pk_query = f"""
-                    SELECT tc.table_name, kcu.column_name
-                    FROM information_schema.table_constraints tc
-                    JOIN information_schema.key_column_usage kcu ON tc.constraint_name = kcu.constraint_name
-                    WHERE tc.table_schema = 'public' AND tc.constraint_type = 'PRIMARY KEY'
-                    {table_filter.replace('t.table_name', 'tc.table_name') if table_filter else ''}
-                    """
-                    cursor.execute(pk_query, params)
-                    for row in cursor.fetchall():
-                        if row['table_name'] in schema_context["tables"]:
-                            schema_context["tables"][row['table_name']]["primary_keys"].append(row['column_name'])
-                    
-                    # ... (Other schema queries like foreign keys would go here) ...
-
-                    await self._analyze_column_values(cursor, schema_context, table_filter, params)
-                    await self._build_entity_mappings(schema_context)
-                    await self._create_semantic_context(schema_context)
-                    await self._generate_natural_language_guide(schema_context)
-                    
-                    if self.redis_client.is_connected():
-                        self.redis_client.cache_schema(cache_key, schema_context)
-                        schema_context["metadata"]["cached"] = True
-
-                    return {"status": "success", "schema_context": schema_context, "cached": schema_context["metadata"]["cached"]}
+            # psycopg2 is blocking, so run the round-trip on a worker thread to keep the event loop free
+            rows = await asyncio.to_thread(self._fetch_schema_metadata, table_names)
+
+            schema_context = {
+                "tables": {}, "relationships": [], "entity_mappings": {},
+                "semantic_context": {}, "column_value_analysis": {},
+                "natural_language_guide": {}, "metadata": {
+                    "cached": False, "cache_key": cache_key
+                }
+            }
+
+            column_stats = {}
+            for table_name, meta in rows:
+                schema_context["tables"][table_name] = {
+                    "columns": {
+                        c["column_name"]: {"data_type": c["data_type"], "is_nullable": c["is_nullable"]}
+                        for c in meta["columns"]
+                    },
+                    "primary_keys": meta["primary_keys"],
+                    "foreign_keys": meta["foreign_keys"]
+                }
+                schema_context["relationships"].extend(
+                    {"from_table": table_name, "from_column": fk["column"],
+                     "to_table": fk["references_table"], "to_column": fk["references_column"]}
+                    for fk in meta["foreign_keys"]
+                )
+                column_stats[table_name] = meta["column_stats"]
+
+            # Post-processing is pure CPU work on the fetched metadata, so it runs inline
+            self._analyze_column_values(schema_context, column_stats)
+            self._build_entity_mappings(schema_context)
+            self._create_semantic_context(schema_context)
+            self._generate_natural_language_guide(schema_context)
+
+            if redis_client.is_connected():
+                await asyncio.to_thread(redis_client.cache_schema, cache_key, schema_context)
+                schema_context["metadata"]["cached"] = True
+
+            return {"status": "success", "schema_context": schema_context, "cached": schema_context["metadata"]["cached"]}
 
         except psycopg2.Error as e:
             return {"status": "error", "message": f"Database error: {str(e)}"}
         except Exception as e:
             return {"status": "error", "message": f"Unexpected error: {str(e)}"}
 
-    async def _analyze_column_values(self, cursor, schema_context: Dict[str, Any], table_filter: str, params: List[str]):
+    def _fetch_schema_metadata(self, table_names: Optional[List[str]]) -> List[tuple]:
+        """Run the schema metadata query and return one (table_name, meta) row per table"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                # The table filter is a single array parameter, NULL for all tables
+                table_list = list(table_names) if table_names else None
+                params = (table_list, table_list)
+
+                # One row per table, so a plain fetch is all that is needed; psycopg2 decodes the jsonb
+                cursor.execute(SCHEMA_METADATA_QUERY, params)
+                rows = cursor.fetchall()
+
+            # Text columns without usable pg_stats (never ANALYZEd, fractional n_distinct,
+            # incomplete most_common_vals) get their stats computed directly, in a single statement;
+            # columns we cannot SELECT are skipped so they don't abort the whole batch
+            missing = [
+                (table_name, c["column_name"])
+                for table_name, meta in rows
+                for c in meta["columns"]
+                if c["data_type"] in TEXT_DATA_TYPES and c["is_selectable"]
+                and not has_usable_column_stats(meta["column_stats"].get(c["column_name"]))
+            ]
+            if missing:
+                metas = dict(rows)
+                for table_name, column_name, stats in self._sample_column_stats(conn, missing):
+                    metas[table_name]["column_stats"][column_name] = stats
+            return rows
+
+    def _sample_column_stats(self, conn, columns: List[tuple]) -> List[tuple]:
+        """Compute distinct count and distinct values for each (table, column) in one query"""
+        # Reads a bounded sample and stops at CATEGORICAL_THRESHOLD + 1 distinct values,
+        # which is enough to tell whether a column is categorical
+        query = sql.SQL(" UNION ALL ").join(
+            sql.SQL("""
+            SELECT {table_label}, {column_label}, jsonb_build_object(
+                'n_distinct', COUNT(*),
+                'most_common_vals', jsonb_agg(v)
+            )
+            FROM (
+                SELECT DISTINCT {column} AS v
+                FROM (SELECT {column} FROM {table} WHERE {column} IS NOT NULL LIMIT 10000) s
+                LIMIT {max_distinct}
+            ) d""").format(
+                table_label=sql.Literal(table_name),
+                column_label=sql.Literal(column_name),
+                column=sql.Identifier(column_name),
+                table=sql.Identifier("public", table_name),
+                max_distinct=sql.Literal(CATEGORICAL_THRESHOLD + 1)
+            )
+            for table_name, column_name in columns
+        )
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query)
+                return cursor.fetchall()
+        except psycopg2.Error as e:
+            # Anything still failing here (e.g. a lock or statement timeout) only costs the fallback stats
+            conn.rollback()
+            logger.warning(f"Could not analyze column values: {e}")
+            return []
+
+    def _analyze_column_values(self, schema_context: Dict[str, Any], column_stats: Dict[str, Dict[str, Any]]):
         """Analyze column values to understand data patterns and possible values"""
         for table_name, table_info in schema_context["tables"].items():
-            try:
-                for column_name, column_info in table_info["columns"].items():
-                    column_analysis = {
-                        "is_categorical": False,
-                        "unique_values": [],
-                        "semantic_type": self._infer_semantic_type(column_name, column_info["data_type"])
-                    }
-                    if column_info["data_type"] in ["text", "varchar", "character varying"]:
-                        try:
-                            cursor.execute(f"SELECT DISTINCT \"{column_name}\" FROM \"{table_name}\" LIMIT 20")
-                            values = [row[column_name] for row in cursor.fetchall()]
-                            cursor.execute(f"SELECT COUNT(DISTINCT \"{column_name}\") as c FROM \"{table_name}\"")
-                            distinct_count = cursor.fetchone()['c']
-                            if distinct_count <= 10:
-                                column_analysis["is_categorical"] = True
-                                column_analysis["unique_values"] = values
-                        except Exception:
-                            pass # Ignore errors on specific columns
-                    
-                    if table_name not in schema_context["column_value_analysis"]:
-                        schema_context["column_value_analysis"][table_name] = {}
-                    schema_context["column_value_analysis"][table_name][column_name] = column_analysis
-            except Exception:
-                pass # Ignore errors on specific tables
-
-    async def _build_entity_mappings(self, schema_context: Dict[str, Any]):
+            table_analysis = schema_context["column_value_analysis"].setdefault(table_name, {})
+            for column_name, column_info in table_info["columns"].items():
+                column_analysis = {
+                    "is_categorical": False,
+                    "unique_values": [],
+                    "semantic_type": self._infer_semantic_type(column_name, column_info["data_type"])
+                }
+                stats = column_stats.get(table_name, {}).get(column_name)
+                if column_info["data_type"] in TEXT_DATA_TYPES and has_usable_column_stats(stats):
+                    if estimated_distinct_count(stats) <= CATEGORICAL_THRESHOLD:
+                        column_analysis["is_categorical"] = True
+                        column_analysis["unique_values"] = stats['most_common_vals'][:20]
+                table_analysis[column_name] = column_analysis
+
+    def _build_entity_mappings(self, schema_context: Dict[str, Any]):
         """Build intelligent entity mappings for natural language understanding"""
         entity_mappings = {}
-        for table_name, table_info in schema_context["tables"].items():
-            for column_name, column_info in table_info["columns"].items():
-                analysis = schema_context.get("column_value_analysis", {}).get(table_name, {}).get(column_name, {})
-                if analysis.get("is_categorical"):
-                    for value in analysis.get("unique_values", []):
-                        if value and isinstance(value, str):
-                            entity_key = f"{value.lower()}s" if not value.lower().endswith('s') else value.lower()
-                            entity_mappings[entity_key] = {
-                                "table": table_name,
-                                "filter_condition": f"\"{column_name}\" = '{value}'",
-                                "description": f"All {value}s from {table_name} table"
-                            }
+        for table_name, columns in schema_context["column_value_analysis"].items():
+            for column_name, analysis in columns.items():
+                if not analysis["is_categorical"]:
+                    continue
+                for value in analysis["unique_values"]:
+                    if not value or not isinstance(value, str):
+                        continue
+                    value_lower = value.lower()
+                    entity_key = value_lower if value_lower.endswith('s') else f"{value_lower}s"
+                    entity_mappings[entity_key] = {
+                        "table": table_name,
+                        "filter_condition": f"\"{column_name}\" = '{value}'",
+                        "description": f"All {value}s from {table_name} table"
+                    }
         schema_context["entity_mappings"] = entity_mappings
 
-    async def _create_semantic_context(self, schema_context: Dict[str, Any]):
+    def _create_semantic_context(self, schema_context: Dict[str, Any]):
         """Create semantic context for better AI understanding"""
         schema_context["semantic_context"] = {"table_purposes": {}}
         for table_name, table_info in schema_context["tables"].items():
-            purpose = f"Stores {table_name} information"
-            cols = [c.lower() for c in table_info["columns"].keys()]
-            if "email" in cols and "password" in cols:
-                purpose = "User authentication and profile data"
+            cols = {c.lower() for c in table_info["columns"]}
+            purpose = next(
+                (label for signature, label in TABLE_PURPOSE_SIGNATURES if signature <= cols),
+                f"Stores {table_name} information"
+            )
             schema_context["semantic_context"]["table_purposes"][table_name] = purpose
 
-    async def _generate_natural_language_guide(self, schema_context: Dict[str, Any]):
+    def _generate_natural_language_guide(self, schema_context: Dict[str, Any]):
         """Generate natural language guide for AI"""
         guide = {"available_tables": list(schema_context["tables"].keys()), "entity_resolution": {}}
         for entity, mapping in schema_context.get("entity_mappings", {}).items():
             guide["entity_resolution"][entity] = {
-                "maps_to": f"SELECT * FROM \"{mapping['table']}\" WHERE {mapping['filter_condition']}",
+                "maps_to": ENTITY_QUERY_TEMPLATE.format_map(mapping),
                 "description": mapping.get("description", "")
             }
         schema_context["natural_language_guide"] = guide
 
-    def _infer_semantic_type(self, column_name: str, data_type: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _infer_semantic_type(column_name: str, data_type: str) -> str:
         """Infer semantic type from column name and data type"""
         column_lower = column_name.lower()
-        if "email" in column_lower: return "email"
-        if "phone" in column_lower: return "phone"
-        if "password" in column_lower: return "password"
-        if "status" in column_lower: return "status"
-        if "role" in column_lower: return "role"
-        if "_at" in column_lower: return "timestamp"
-        if "id" in column_lower: return "identifier"
-        if "name" in column_lower: return "name"
+        for token, semantic_type in SEMANTIC_TYPE_TOKENS:
+            if token in column_lower:
+                return semantic_type
         return "unknown"
 
-# Global instance
-db_ops = DatabaseOperations()
+# Global instance, created on first use rather than at import time
+@lru_cache(maxsize=1)
+def get_db_ops() -> DatabaseOperations:
+    return DatabaseOperations()
 
 # Convenience function for the main script to call
 async def fetch_schema_context(table_names: Optional[List[str]] = None, include_samples: bool = False) -> Dict[str, Any]:
     """Fetch database schema context - tool function"""
-    return await db_ops.fetch_schema_context(table_names, include_samples)
+    return await get_db_ops().fetch_schema_context(table_names, include_samples)